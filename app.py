@@ -1,13 +1,34 @@
+import os
 import re
+import json
+import asyncio
+import hashlib
+import math
+import time
+import queue
+import signal
+import socket
+import atexit
 import zipfile
 import tempfile
 import subprocess
 import shutil
+import threading
 import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import streamlit as st
 
+# python-uno(LibreOffice 동봉 모듈)가 있으면 상주 soffice에 UNO로 변환 요청
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    from com.sun.star.connection import NoConnectException
+except ImportError:
+    uno = None
+
 
 # -----------------------------
 # 기본 화면
@@ -49,22 +70,250 @@ def find_soffice():
 SOFFICE = find_soffice()
 
 
+def kill_soffice(proc):
+    # soffice는 soffice.bin 자식을 띄우므로 프로세스 그룹째 종료
+    if os.name == "nt":
+        proc.kill()
+        return
+    try:
+        os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+# -----------------------------
+# PDF 내보내기 옵션: 이미지 해상도/품질을 낮추고 태그 PDF를 빼서 PDF 크기 줄이기
+# (이미지가 많은 PPT는 기본 설정 대비 수 배 작아짐 → ZIP/다운로드도 빨라짐)
+# -----------------------------
+PDF_EXPORT_OPTIONS = {
+    "Quality": ("long", 75),
+    "ReduceImageResolution": ("boolean", True),
+    "MaxImageResolution": ("long", 150),
+    "UseTaggedPDF": ("boolean", False),
+}
+
+# CLI용: LibreOffice 7.4+의 JSON 필터 옵션 형식
+PDF_CONVERT_TO = "pdf:impress_pdf_Export:" + json.dumps(
+    {k: {"type": t, "value": str(v).lower()} for k, (t, v) in PDF_EXPORT_OPTIONS.items()}
+)
+
+
+# -----------------------------
+# soffice 프로필 미리 만들어 두기 (첫 실행 때 폰트 캐시/설정 초기화에 1~3초 걸림)
+# -----------------------------
+@st.cache_resource
+def warm_profile():
+    if not SOFFICE:
+        return None
+
+    # 서버 프로세스마다 새로 만들고, soffice가 정상 종료했을 때만 씀
+    # (반쯤 만들어진 프로필이 풀/데몬 프로필로 계속 복사되지 않도록)
+    warm_dir = Path(tempfile.mkdtemp(prefix="lo_warm_"))
+    atexit.register(shutil.rmtree, warm_dir, ignore_errors=True)
+    p = warm_dir / "profile"
+
+    proc = subprocess.Popen(
+        [SOFFICE, f"-env:UserInstallation={p.as_uri()}", "--headless", "--terminate_after_init"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    try:
+        returncode = proc.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        # soffice.bin이 계속 프로필에 쓰지 않도록 프로세스 그룹째 종료
+        kill_soffice(proc)
+        proc.wait()
+        return None
+
+    return p if returncode == 0 and (p / "user").exists() else None
+
+
+SOFFICE_PROFILE = warm_profile()
+
+
+def seed_profile(profile: Path) -> Path:
+    # 미리 만든 프로필을 복사해서 시작 (없으면 soffice가 빈 프로필을 새로 만듦)
+    if SOFFICE_PROFILE is not None and not profile.exists():
+        shutil.copytree(SOFFICE_PROFILE, profile, symlinks=True)
+    return profile
+
+
+# -----------------------------
+# 프로필 풀: 동시에 도는 soffice 수만큼만 프로필을 만들어 두고 돌려 씀
+# (변환마다 새 프로필을 만들면 매번 초기화 비용이 듦)
+# -----------------------------
+POOL_SIZE = os.cpu_count() or 1
+
+
+@st.cache_resource
+def profile_pool():
+    pool_dir = Path(tempfile.mkdtemp(prefix="lo_pool_"))
+    atexit.register(shutil.rmtree, pool_dir, ignore_errors=True)
+
+    pool = queue.Queue()
+    for _ in range(POOL_SIZE):
+        pool.put(seed_profile(pool_dir / f"pool_{uuid.uuid4().hex}"))
+    return pool
+
+
+PROFILE_POOL = profile_pool()
+
+
+@asynccontextmanager
+async def lease_profile():
+    # 다 쓰고 있으면 하나가 반납될 때까지 기다림 (같은 프로필을 두 soffice가 동시에 쓰면 안 됨)
+    # (스레드에서 get()으로 기다리면 중단됐을 때 받은 프로필을 잃어버려서, 여기서 조금씩 다시 확인)
+    while True:
+        try:
+            profile = PROFILE_POOL.get_nowait()
+            break
+        except queue.Empty:
+            await asyncio.sleep(0.2)
+    try:
+        yield profile
+    finally:
+        PROFILE_POOL.put(profile)
+
+
+# -----------------------------
+# 상주 soffice(UNO) 띄우기: 파일마다 soffice 시작 비용을 내지 않도록
+# -----------------------------
+# 문서 하나를 여러 스레드가 동시에 열면 soffice가 불안정해서 한 번에 하나씩
+UNO_LOCK = threading.Lock()
+
+
+def free_port() -> int:
+    # 같은 서버의 다른 앱/남아 있는 데몬과 겹치지 않도록 OS가 비어 있는 포트를 골라 줌
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@st.cache_resource
+def start_soffice_daemon():
+    if uno is None or not SOFFICE:
+        return None
+
+    # 포트/프로필은 서버 프로세스마다 따로
+    daemon_dir = Path(tempfile.mkdtemp(prefix="lo_daemon_"))
+    atexit.register(shutil.rmtree, daemon_dir, ignore_errors=True)
+    profile = seed_profile(daemon_dir / "profile")
+    port = free_port()
+
+    proc = subprocess.Popen(
+        [
+            SOFFICE,
+            f"-env:UserInstallation={profile.as_uri()}",
+            "--headless",
+            "--invisible",
+            "--nologo",
+            "--nofirststartwizard",
+            "--norestore",
+            f"--accept=socket,host=127.0.0.1,port={port};urp;",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    atexit.register(lambda: kill_soffice(proc))
+
+    # 소켓이 열릴 때까지 최대 30초 대기
+    local_ctx = uno.getComponentContext()
+    resolver = local_ctx.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_ctx
+    )
+    for _ in range(60):
+        try:
+            ctx = resolver.resolve(f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext")
+            break
+        except NoConnectException:
+            if proc.poll() is not None:
+                return None
+            time.sleep(0.5)
+    else:
+        kill_soffice(proc)
+        return None
+
+    desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+    return {"proc": proc, "desktop": desktop}
+
+
+UNO_DAEMON = start_soffice_daemon()
+
+
+def uno_desktop():
+    # 데몬이 없거나 멈춰서 내려갔으면 None
+    return UNO_DAEMON["desktop"] if UNO_DAEMON is not None else None
+
+
+def stop_uno_daemon():
+    # 멈춘 데몬은 죽이고 이후로는 CLI로만 변환 (서버 전체가 같이 쓰는 데몬이라 모든 세션에 적용)
+    UNO_DAEMON["desktop"] = None
+    kill_soffice(UNO_DAEMON["proc"])
+
+
+def convert_via_uno(desktop, src: Path, dst: Path) -> bool:
+    # 다른 변환이 데몬을 쓰고 있으면 기다리지 않고 False (→ CLI 풀로 병렬 변환)
+    if not UNO_LOCK.acquire(blocking=False):
+        return False
+
+    hidden = PropertyValue("Hidden", 0, True, 0)
+    filter_data = uno.Any(
+        "[]com.sun.star.beans.PropertyValue",
+        tuple(PropertyValue(k, 0, v, 0) for k, (_, v) in PDF_EXPORT_OPTIONS.items()),
+    )
+    store_props = (
+        PropertyValue("FilterName", 0, "impress_pdf_Export", 0),
+        PropertyValue("FilterData", 0, filter_data, 0),
+    )
+
+    try:
+        doc = desktop.loadComponentFromURL(src.as_uri(), "_blank", 0, (hidden,))
+        if doc is None:
+            raise RuntimeError(f"문서를 열지 못했습니다: {src.name}")
+        try:
+            # FilterData를 uno.Any로 감싸서 넘기려면 uno.invoke를 거쳐야 함
+            uno.invoke(doc, "storeToURL", (dst.as_uri(), store_props))
+        finally:
+            doc.close(True)
+    finally:
+        UNO_LOCK.release()
+
+    return True
+
+
 # -----------------------------
 # 파일명 정렬: CH01 / CH02 ... 우선
 # -----------------------------
+CH_RE = re.compile(r"CH\s*0*(\d+)")
+NUM_RE = re.compile(r"0*(\d+)")
+
+
 def chapter_key(path: Path):
     name = path.name.upper()
-    m = re.search(r"CH\s*0*(\d+)", name)
+    m = CH_RE.search(name)
     if m:
         return (0, int(m.group(1)), path.name)
 
-    m = re.search(r"0*(\d+)", name)
+    m = NUM_RE.search(name)
     if m:
         return (1, int(m.group(1)), path.name)
 
     return (2, 9999, path.name)
 
 
+# -----------------------------
+# 내용이 같은 파일 찾기용 해시
+# -----------------------------
+def file_digest(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=16, usedforsecurity=False)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
 # -----------------------------
 # 안전한 파일명 만들기
 # -----------------------------
@@ -82,59 +331,228 @@ def safe_filename(name: str, max_len: int = 80) -> str:
 # -----------------------------
 # PPT → PDF 변환 (0KB/손상 방지 포함)
 # -----------------------------
-def convert_ppt_to_pdf(input_path: Path, work_dir: Path, out_dir: Path, out_name: str) -> Path:
-    if not SOFFICE:
-        raise RuntimeError("LibreOffice(soffice)를 찾지 못했습니다. 서버에는 packages.txt로 설치되어야 합니다.")
+# soffice 한 번에 넘길 최대 파일 수 (하나가 실패해도 묶음 전체가 망가지지 않도록 적당히)
+BATCH_SIZE = 8
 
-    # 1) 입력을 '영어/짧은 임시 이름'으로 복사 (한글/긴 이름 이슈 방지)
-    tmp_stem = f"input_{uuid.uuid4().hex}"
-    safe_in = work_dir / f"{tmp_stem}{input_path.suffix.lower()}"
-    shutil.copyfile(input_path, safe_in)
 
-    # 2) LibreOffice로 변환 (필터 지정 + 타임아웃)
-    cmd = [
+def soffice_cmd(profile: Path, out_dir: Path, inputs) -> list:
+    # soffice마다 별도 프로필을 써야 여러 개가 동시에 돌 수 있음
+    # (프로필을 공유하면 두 번째 실행이 첫 번째 프로세스에 작업을 넘기고 바로 끝나 버림)
+    return [
         SOFFICE,
+        f"-env:UserInstallation={profile.as_uri()}",
         "--headless",
         "--nologo",
         "--nofirststartwizard",
-        "--convert-to", "pdf:impress_pdf_Export",
+        "--convert-to", PDF_CONVERT_TO,
         "--outdir", str(out_dir),
-        str(safe_in),
+        *[str(p) for p in inputs],
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=240)
 
-    if result.returncode != 0:
-        raise RuntimeError(
-            f"[변환 실패] {input_path.name}\n\nstderr:\n{result.stderr}\n\nstdout:\n{result.stdout}"
-        )
-
-    # 3) 변환된 PDF 찾기
-    made_pdf = out_dir / f"{tmp_stem}.pdf"
+async def run_soffice(out_dir: Path, inputs, timeout: int, attempts: int = 2) -> subprocess.CompletedProcess:
+    # 시간 초과로 멈추면 죽이고, 그 프로필은 새로 만든 뒤 다시 시도
+    for attempt in range(attempts):
+        async with lease_profile() as profile:
+            cmd = soffice_cmd(profile, out_dir, inputs)
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+                return subprocess.CompletedProcess(
+                    cmd, proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+                )
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                # 시간 초과든 중단(재실행/세션 종료로 취소)이든 soffice가 살아 있으면
+                # 프로필을 풀에 돌려주기 전에 반드시 죽이고 기다림
+                if proc.returncode is None:
+                    kill_soffice(proc)
+                    await proc.wait()
+                    # 멈춘 soffice가 남긴 잠금 파일 등이 있을 수 있어 초기화 (프로필 복사는 스레드에서)
+                    await asyncio.to_thread(reset_profile, profile)
+
+    raise subprocess.TimeoutExpired(cmd, timeout)
+
+
+def reset_profile(profile: Path):
+    shutil.rmtree(profile, ignore_errors=True)
+    seed_profile(profile)
+
+
+def stage_input(src: Path, dst: Path):
+    # 윈도우가 아니면 복사 대신 심볼릭 링크로 '영어 이름'만 붙임 (큰 PPT 복사 IO 생략)
+    if os.name == "nt":
+        shutil.copyfile(src, dst)
+    else:
+        os.symlink(src.resolve(), dst)
+
+
+def finish_pdf(made_pdf: Path, input_path: Path, out_dir: Path, out_name: str) -> Path:
+    # 변환된 PDF 찾기
     if not made_pdf.exists():
         raise RuntimeError(f"PDF 생성 실패(파일 없음): {input_path.name}")
 
-    # 4) 0KB/손상 검사 (핵심)
-    if made_pdf.stat().st_size < 5_000:
+    # 0KB/손상 검사 (핵심) - 한 번 열어서 헤더와 크기를 같이 확인
+    with open(made_pdf, "rb") as f:
+        head = f.read(5)
+        size = f.seek(0, os.SEEK_END)
+
+    if size < 5_000:
         raise RuntimeError(f"PDF가 0KB/비정상 크기(변환 실패): {input_path.name}")
 
-    with open(made_pdf, "rb") as f:
-        if f.read(5) != b"%PDF-":
-            raise RuntimeError(f"PDF 헤더 없음(손상/비PDF): {input_path.name}")
+    if head != b"%PDF-":
+        raise RuntimeError(f"PDF 헤더 없음(손상/비PDF): {input_path.name}")
 
-    # 5) 최종 이름으로 변경
+    # 최종 이름으로 변경 (같은 이름이 있으면 한 번에 덮어씀)
     final_pdf = out_dir / out_name
-    if final_pdf.exists():
-        final_pdf.unlink()
-    made_pdf.rename(final_pdf)
+    os.replace(made_pdf, final_pdf)
+
+    return final_pdf
+
+
+async def convert_ppt_to_pdf(
+    input_path: Path, work_dir: Path, out_dir: Path, out_name: str, sem: asyncio.Semaphore, attempts: int = 2
+) -> Path:
+    if not SOFFICE:
+        raise RuntimeError("LibreOffice(soffice)를 찾지 못했습니다. 서버에는 packages.txt로 설치되어야 합니다.")
+
+    # 1) 입력에 '영어/짧은 임시 이름' 붙이기 (한글/긴 이름 이슈 방지)
+    #    (변환 자리를 기다리기 전에 해 둬서 앞 파일 변환과 겹치게)
+    tmp_stem = f"input_{uuid.uuid4().hex}"
+    safe_in = work_dir / f"{tmp_stem}{input_path.suffix.lower()}"
+    await asyncio.to_thread(stage_input, input_path, safe_in)
 
-    # 6) 임시 입력 정리
+    made_pdf = out_dir / f"{tmp_stem}.pdf"
+
+    async with sem:
+        # 2) 상주 soffice가 놀고 있으면 UNO로 변환 (CLI와 같은 240초 제한)
+        converted = False
+        desktop = uno_desktop()
+        if desktop is not None:
+            try:
+                converted = await asyncio.wait_for(
+                    asyncio.to_thread(convert_via_uno, desktop, safe_in, made_pdf), 240
+                )
+            except asyncio.TimeoutError:
+                # 데몬이 멈춤 → 내리고 아래 CLI 변환으로 다시 시도
+                stop_uno_daemon()
+            except Exception:
+                # 데몬이 죽었거나 UNO 오류 → 아래 CLI 변환으로 다시 시도
+                pass
+            if not converted and made_pdf.exists():
+                made_pdf.unlink()
+
+        # 3) 없으면 LibreOffice CLI로 변환 (필터 지정 + 타임아웃)
+        if not converted:
+            result = await run_soffice(out_dir, [safe_in], timeout=240, attempts=attempts)
+
+            if result.returncode != 0:
+                raise RuntimeError(
+                    f"[변환 실패] {input_path.name}\n\nstderr:\n{result.stderr}\n\nstdout:\n{result.stdout}"
+                )
+
+    # 4) 검사 후 최종 이름으로 변경
+    final_pdf = await asyncio.to_thread(finish_pdf, made_pdf, input_path, out_dir, out_name)
+
+    # 5) 임시 입력 정리
     if safe_in.exists():
         safe_in.unlink()
 
     return final_pdf
 
 
+async def try_convert(
+    input_path: Path, work_dir: Path, out_dir: Path, out_name: str, sem: asyncio.Semaphore, attempts: int = 2
+):
+    # 성공하면 PDF 경로, 실패하면 예외 객체를 돌려줌 (묶음 변환에서 파일별 결과 모으기용)
+    try:
+        return await convert_ppt_to_pdf(input_path, work_dir, out_dir, out_name, sem, attempts)
+    except Exception as e:
+        return e
+
+
+# -----------------------------
+# 여러 PPT를 soffice 한 번으로 변환 (시작 비용을 묶음 단위로 한 번만)
+# -----------------------------
+async def convert_batch(jobs, work_dir: Path, out_dir: Path, sem: asyncio.Semaphore) -> list:
+    # jobs: [(입력 경로, 최종 PDF 이름), ...] → 같은 순서로 PDF 경로 또는 예외를 돌려줌
+    if not SOFFICE or len(jobs) == 1:
+        return await asyncio.gather(*[try_convert(p, work_dir, out_dir, name, sem) for p, name in jobs])
+
+    # 1) 입력에 'input_<묶음id>_<번호>' 이름 붙이기 (결과 PDF와 원본을 다시 짝짓기 위해)
+    batch_id = uuid.uuid4().hex
+    safe_inputs = []
+    for idx, (input_path, _) in enumerate(jobs):
+        safe_in = work_dir / f"input_{batch_id}_{idx}{input_path.suffix.lower()}"
+        await asyncio.to_thread(stage_input, input_path, safe_in)
+        safe_inputs.append(safe_in)
+
+    # 2) 한 번에 변환 (타임아웃은 파일 수만큼 늘림, 실패한 파일은 아래에서 파일별로 다시 하므로 재시도 없음)
+    #    (입력 하나만 못 열어도 soffice가 0이 아닌 코드로 끝날 수 있어서 종료 코드는 보지 않음)
+    try:
+        async with sem:
+            await run_soffice(out_dir, safe_inputs, timeout=240 * len(jobs), attempts=1)
+        timed_out = False
+    except subprocess.TimeoutExpired:
+        timed_out = True
+
+    # 3) 원본과 짝지어 검사/이름 변경 (PDF가 없거나 검사에 걸린 파일만 다시 변환할 목록에)
+    results = []
+    retry = []
+    for idx, (safe_in, (input_path, out_name)) in enumerate(zip(safe_inputs, jobs)):
+        made_pdf = out_dir / f"{safe_in.stem}.pdf"
+        if timed_out:
+            # 죽인 soffice가 쓰다 만 PDF일 수 있으니 버림
+            if made_pdf.exists():
+                made_pdf.unlink()
+            results.append(None)
+            retry.append(idx)
+        else:
+            try:
+                results.append(await asyncio.to_thread(finish_pdf, made_pdf, input_path, out_dir, out_name))
+            except Exception:
+                results.append(None)
+                retry.append(idx)
+
+        if safe_in.exists():
+            safe_in.unlink()
+
+    # 4) 빠진 파일만 파일별로 다시 변환
+    #    (묶음이 시간 초과였으면 멈춘 파일에 이미 한 번 기다렸으니 파일별 재시도는 한 번만)
+    retried = await asyncio.gather(*[
+        try_convert(jobs[idx][0], work_dir, out_dir, jobs[idx][1], sem, attempts=1 if timed_out else 2)
+        for idx in retry
+    ])
+    for idx, res in zip(retry, retried):
+        results[idx] = res
+
+    return results
+
+
+def add_to_zip(z: zipfile.ZipFile, pdf: Path, arcnames):
+    # 같은 PDF를 여러 이름으로 넣은 뒤 지움
+    for arcname in arcnames:
+        z.write(pdf, arcname=arcname)
+    pdf.unlink()
+
+
+async def convert_all(chunks, work_dir: Path, out_dir: Path, max_workers: int, on_result):
+    # 이벤트 루프 하나로 모든 soffice를 관리 (동시 실행은 max_workers개까지)
+    # 파일 하나가 끝날 때마다 on_result(job, PDF 경로 또는 예외)를 await (ZIP 쓰기가 한 번에 하나씩 되도록)
+    sem = asyncio.Semaphore(max_workers)
+
+    async def run_chunk(chunk):
+        return chunk, await convert_batch(chunk, work_dir, out_dir, sem)
+
+    for fut in asyncio.as_completed([run_chunk(chunk) for chunk in chunks]):
+        chunk, results = await fut
+        for job, res in zip(chunk, results):
+            await on_result(job, res)
+
+
 # -----------------------------
 # 업로드
 # -----------------------------
@@ -148,83 +566,125 @@ if st.button("PDF로 일괄 변환 시작"):
     with st.spinner("변환 중… (파일 수/용량에 따라 시간이 걸릴 수 있어요)"):
         with tempfile.TemporaryDirectory() as tmp:
             tmp_dir = Path(tmp)
-            in_dir = tmp_dir / "inputs"
             extract_dir = tmp_dir / "unzipped"
             work_dir = tmp_dir / "work"
             pdf_dir = tmp_dir / "pdfs"
 
-            in_dir.mkdir()
             extract_dir.mkdir()
             work_dir.mkdir()
             pdf_dir.mkdir()
 
-            # 1) 업로드된 ZIP 저장 & 해제
-            zip_path = in_dir / uploaded_zip.name
-            zip_path.write_bytes(uploaded_zip.getvalue())
-
-            with zipfile.ZipFile(zip_path, "r") as z:
-                z.extractall(extract_dir)
-
-            # 2) PPT만 찾기 (다른 파일은 자동 제외)
+            # 1) 업로드된 ZIP에서 PPT만 골라서 해제
+            #    (업로드 버퍼를 바로 ZipFile로 읽음 → ZIP을 디스크에 따로 저장하지 않음,
+            #     다른 파일은 디스크에 쓰지 않고 목록만 확인)
             allowed_ext = {".ppt", ".pptx", ".pptm"}
-            all_files = list(extract_dir.rglob("*"))
-            ppt_files = [p for p in all_files if p.is_file() and p.suffix.lower() in allowed_ext]
-
-            # (참고용) 제외된 파일 목록
-            skipped_files = [p for p in all_files if p.is_file() and p.suffix.lower() not in allowed_ext]
+            uploaded_zip.seek(0)
+            with zipfile.ZipFile(uploaded_zip, "r", allowZip64=True) as z:
+                # 목록을 한 번만 훑으면서 PPT / 제외(참고용) 파일로 나눔
+                ppt_infos = []
+                skipped_files = []
+                for info in z.infolist():
+                    if info.is_dir():
+                        continue
+                    if os.path.splitext(info.filename)[1].lower() in allowed_ext:
+                        ppt_infos.append(info)
+                    else:
+                        skipped_files.append(info.filename)
+
+                # extract()가 위험한 경로(../ 등)를 정리한 실제 경로를 돌려줌
+                ppt_files = [Path(z.extract(info, extract_dir)) for info in ppt_infos]
+
+            # 같은 내용인지 비교할 키: ZIP에 이미 있는 CRC/크기로 먼저 거르고, 겹칠 때만 해시로 확인
+            crc_counts = Counter((info.CRC, info.file_size) for info in ppt_infos)
+            content_keys = {}
+            for info, path in zip(ppt_infos, ppt_files):
+                key = (info.CRC, info.file_size)
+                content_keys[path] = file_digest(path) if crc_counts[key] > 1 else key
 
             if not ppt_files:
                 st.error("ZIP 안에서 PPT/PPTX/PPTM 파일을 찾지 못했습니다.")
                 st.stop()
 
-            # 3) 정렬
+            # 2) 정렬
             ppt_files.sort(key=chapter_key)
 
+            # 목록은 줄마다 st.write 하지 않고 한 번에 (요소마다 브라우저로 메시지가 감)
             st.subheader("변환 대상(PPT만)")
-            for p in ppt_files:
-                st.write(f"- {p.relative_to(extract_dir)}")
+            st.write("\n".join(f"- {p.relative_to(extract_dir)}" for p in ppt_files))
 
             if skipped_files:
                 st.subheader("자동 제외된 파일(변환 안 함)")
                 # 너무 길면 일부만 보여주기
-                for p in skipped_files[:30]:
-                    st.write(f"- {p.relative_to(extract_dir)}")
+                lines = [f"- {name}" for name in skipped_files[:30]]
                 if len(skipped_files) > 30:
-                    st.write(f"(…외 {len(skipped_files)-30}개 더 있음)")
+                    lines.append(f"\n(…외 {len(skipped_files)-30}개 더 있음)")
+                st.write("\n".join(lines))
 
-            # 4) 변환
+            # 3) 변환하면서 성공한 PDF만 바로 ZIP에 넣기
+            #    (PDF는 이미 압축돼 있어서 deflate는 CPU만 쓰고 크기는 거의 안 줄어듦 → 무압축 저장)
             progress = st.progress(0)
             errors = []
-            success_count = 0
-
-            for i, ppt in enumerate(ppt_files, start=1):
-                try:
-                    base = safe_filename(ppt.stem)
-                    out_name = f"{i:02d}_{base}.pdf"
-                    convert_ppt_to_pdf(ppt, work_dir=work_dir, out_dir=pdf_dir, out_name=out_name)
-                    success_count += 1
-                except Exception as e:
-                    errors.append(str(e))
-
-                progress.progress(int(i / len(ppt_files) * 100))
-
-            # 5) 성공한 PDF만 ZIP으로 묶기
+            zipped = []
+            done_count = 0
             out_zip = tmp_dir / "PDFs.zip"
-            pdf_list = sorted(pdf_dir.glob("*.pdf"))
-
-            with zipfile.ZipFile(out_zip, "w", compression=zipfile.ZIP_DEFLATED) as z:
-                for pdf in pdf_list:
-                    z.write(pdf, arcname=pdf.name)
 
+            # 내용이 같은 PPT는 한 번만 변환하고, 나온 PDF를 각자 이름으로 ZIP에 넣음
+            # duplicates: 변환할 PDF 이름 → 같은 내용인 나머지 파일들 [(PPT 경로, PDF 이름), ...]
+            jobs = []
+            duplicates = {}
+            first_name_by_key = {}
+            for i, ppt in enumerate(ppt_files, start=1):
+                out_name = f"{i:02d}_{safe_filename(ppt.stem)}.pdf"
+                key = content_keys[ppt]
+                if key in first_name_by_key:
+                    duplicates[first_name_by_key[key]].append((ppt, out_name))
+                else:
+                    first_name_by_key[key] = out_name
+                    duplicates[out_name] = []
+                    jobs.append((ppt, out_name))
+
+            # soffice를 CPU 수만큼 동시에 돌리고, 각각은 파일 여러 개를 묶어서 변환
+            max_workers = min(POOL_SIZE, len(jobs))
+            chunk_size = min(BATCH_SIZE, math.ceil(len(jobs) / max_workers))
+            chunks = [jobs[k:k + chunk_size] for k in range(0, len(jobs), chunk_size)]
+
+            with zipfile.ZipFile(out_zip, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as z:
+                async def add_result(job, res):
+                    # 파일 하나 끝날 때마다: 성공한 PDF는 (같은 내용 파일 이름으로도) 바로 ZIP에 넣고 지움
+                    # (ZIP 쓰기는 스레드에서 → 그동안에도 다른 soffice 변환은 계속 진행)
+                    # (스크립트 최상위에서 실행되므로 nonlocal 대신 global)
+                    global done_count
+                    ppt, out_name = job
+                    done_count += 1
+                    if isinstance(res, Exception):
+                        errors.append(str(res))
+                        # 같은 내용이라 변환을 건너뛴 파일도 실패 목록에 하나씩 남김
+                        for dup_ppt, _ in duplicates[out_name]:
+                            errors.append(f"[변환 실패] {dup_ppt.name}\n\n(내용이 같은 {ppt.name} 변환 실패)")
+                    else:
+                        arcnames = [out_name, *[name for _, name in duplicates[out_name]]]
+                        await asyncio.to_thread(add_to_zip, z, res, arcnames)
+                        zipped.extend(arcnames)
+
+                    # 진행률은 %가 바뀔 때만 갱신 (파일이 많으면 갱신 메시지만 수천 번)
+                    pct = done_count * 100 // len(jobs)
+                    if pct != (done_count - 1) * 100 // len(jobs):
+                        progress.progress(pct)
+
+                asyncio.run(convert_all(chunks, work_dir, pdf_dir, max_workers, add_result))
+
+            success_count = len(zipped)
             st.success(f"완료! 성공: {success_count}개 / 전체: {len(ppt_files)}개")
-            st.download_button(
-                "PDFs.zip 다운로드(정상 PDF만 포함)",
-                data=out_zip.read_bytes(),
-                file_name="PDFs.zip",
-                mime="application/zip"
-            )
-
-            # 6) 실패 목록 출력
+            # bytes로 읽어 두지 않고 파일 핸들을 넘김 (Streamlit이 버튼을 만들 때 읽어 감)
+            with out_zip.open("rb") as f:
+                st.download_button(
+                    "PDFs.zip 다운로드(정상 PDF만 포함)",
+                    data=f,
+                    file_name="PDFs.zip",
+                    mime="application/zip"
+                )
+
+            # 4) 실패 목록 출력
             if errors:
                 st.warning("아래 파일은 변환에 실패했습니다(0KB 방지로 ZIP에 넣지 않았습니다).")
                 for e in errors: